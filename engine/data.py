@@ -1,4 +1,6 @@
 from torch.utils.data import Dataset, DataLoader
+from torch.utils.data.distributed import DistributedSampler
+import torch.distributed as dist
 from torchvision.transforms import v2
 import torch
 
@@ -36,14 +38,27 @@ class DataModule:
         self.transform = v2.Compose(transform_arr)
         self.undo_transform = v2.Compose(undo_transform_arr)
 
-    def get_dataloader(self, batch_size: int, is_train=True, shuffle=True):
+    def get_dataloader(
+        self, batch_size: int, is_train=True, shuffle=True, num_workers: int = None
+    ):
         self.update_dataset(is_train)
+        if num_workers is None:
+            num_workers = self._num_workers
+        dataset = self._train_dataset if is_train else self._val_dataset
+        sampler = None
+        if dist.is_initialized():
+            # Each process reads its own part of the dataset
+            sampler = DistributedSampler(dataset, shuffle=shuffle)
+            shuffle = False
 
         return DataLoader(
-            self._train_dataset if is_train else self._val_dataset,
+            dataset,
             batch_size,
             shuffle=shuffle,
-            num_workers=self._num_workers,
+            sampler=sampler,
+            num_workers=num_workers,
+            pin_memory=torch.cuda.is_available(),
+            persistent_workers=num_workers > 0,
         )
 
     def train_dataloader(self):
@@ -73,7 +88,10 @@ class DataModule:
         return []
 
     def get_test_batch(self, num: int, is_train=False):
-        dataloader = self.get_dataloader(num, is_train=is_train, shuffle=True)
+        # Starting worker processes for a single batch costs more than reading it
+        dataloader = self.get_dataloader(
+            num, is_train=is_train, shuffle=True, num_workers=0
+        )
         images, targets = next(iter(dataloader))
         return self.undo_transform(images), images, targets
 
@@ -1,6 +1,7 @@
 import os
 import torch
 from torch import nn
+from utils.fuse import fuse_conv_bn
 
 
 class Module(nn.Module):
@@ -27,6 +28,22 @@ class Module(nn.Module):
     def predict(self, X):
         raise NotImplementedError
     
+    def fuse_for_inference(self):
+        """Replaces each Conv2d -> BatchNorm2d pair in nn.Sequential blocks with a single
+        Conv2d. Irreversible: the fused model should not be trained or saved, so for
+        inference only make a copy once and reuse it:
+        copy.deepcopy(model).eval().fuse_for_inference()"""
+        assert not self.training, "Fusion uses running statistics, call eval() first"
+        for module in self.modules():
+            if not isinstance(module, nn.Sequential):
+                continue
+            for idx in range(len(module) - 1):
+                conv, bn = module[idx], module[idx + 1]
+                if isinstance(conv, nn.Conv2d) and isinstance(bn, nn.BatchNorm2d):
+                    module[idx] = fuse_conv_bn(conv, bn)
+                    module[idx + 1] = nn.Identity()
+        return self
+
     def save_params(self, name: str = ""):
         os.makedirs("./nets", exist_ok=True)
         if not name:
@@ -1,4 +1,8 @@
 import torch
+from torch import nn
+import torch.distributed as dist
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data.distributed import DistributedSampler
 from engine.data import DataModule
 from engine.model import Module
 import utils.devices as devices
@@ -7,12 +11,25 @@ from utils.plotter import Plotter
 from tqdm import tqdm
 
 
+PRECISIONS = {"fp32": torch.float32, "bf16": torch.bfloat16, "fp16": torch.float16}
+
+
 class Trainer:
     """The base class for training models with data."""
 
-    def __init__(self, num_gpus=0, display=True, every_n=4):
+    def __init__(self, num_gpus=0, display=True, every_n=4, precision="fp32"):
+        """
+        Args:
+            precision (str, optional): Autocast precision of forward pass: fp32, bf16 or fp16.
+        """
         self.display, self.every_n = display, every_n
+        self.dtype = PRECISIONS[precision]
+        # bf16 has the fp32 range, only fp16 needs loss scaling
+        self.scaler = torch.cuda.amp.GradScaler(enabled=self.dtype == torch.float16)
         self.gpus = [devices.gpu(i) for i in range(min(num_gpus, devices.num_gpus()))]
+        if dist.is_initialized():
+            # One process per GPU, the device is selected by the launcher
+            self.gpus = [devices.gpu(torch.cuda.current_device())]
         self.board = ProgressBoard(yscale="log", display=self.display)
         self.train_batch_idx = 0
         self.val_batch_idx = 0
@@ -33,12 +50,24 @@ class Trainer:
         if self.gpus:
             model.to(self.gpus[0])
         self.model = model
+        self.training_step = model.training_step
+        if dist.is_initialized():
+            self.training_step = DistributedDataParallel(
+                TrainingStep(model), device_ids=self.gpus
+            )
 
     def prepare_batch(self, batch):
         if self.gpus:
-            batch = [torch.Tensor.to(a, self.gpus[0]) for a in batch]
+            batch = [torch.Tensor.to(a, self.gpus[0], non_blocking=True) for a in batch]
         return batch
 
+    def autocast(self):
+        return torch.autocast(
+            self.gpus[0].type if self.gpus else "cpu",
+            dtype=self.dtype,
+            enabled=self.dtype != torch.float32,
+        )
+
     def fit(self, num_epochs=1):
         for self.epoch in tqdm(range(num_epochs), leave=False, desc="Epoch"):
             self.fit_epoch()
@@ -66,12 +95,16 @@ class Trainer:
     def fit_epoch(self):
         # Training
         self.model.train()
+        if isinstance(self.train_dataloader.sampler, DistributedSampler):
+            self.train_dataloader.sampler.set_epoch(self.epoch)
         for batch in tqdm(self.train_dataloader, leave=False, desc="Batch: "):
-            train_loss = self.model.training_step(self.prepare_batch(batch))
+            with self.autocast():
+                train_loss = self.training_step(self.prepare_batch(batch))
             self.optim.zero_grad()
             with torch.no_grad():
-                train_loss.backward()
-                self.optim.step()
+                self.scaler.scale(train_loss).backward()
+                self.scaler.step(self.optim)
+                self.scaler.update()
                 self.plot(train_loss, is_train=True)
             self.train_batch_idx += 1
         # Validation
@@ -79,7 +112,7 @@ class Trainer:
             return
         self.model.eval()
         for batch in self.val_dataloader:
-            with torch.no_grad():
+            with torch.no_grad(), self.autocast():
                 val_loss = self.model.validation_step(self.prepare_batch(batch))
                 self.plot(val_loss, is_train=False)
             self.val_batch_idx += 1
@@ -89,7 +122,20 @@ class Trainer:
             plotter.rows * plotter.columns, is_train
         )
         if self.gpus:
-            tensors = tensors.to(self.gpus[0])
-        predictions = self.model.predict(tensors).to(devices.cpu())
+            tensors = tensors.to(self.gpus[0], non_blocking=True)
+        with torch.no_grad():
+            predictions = self.model.predict(tensors).to(devices.cpu())
         # predictions is array of tensor [num_pred, 6] - [class, roi, luw, luh, rdw, rdh]
         plotter.display(images, predictions, target)
+
+
+class TrainingStep(nn.Module):
+    """Calls Module.training_step in forward, so that DistributedDataParallel
+    can synchronize gradients of the whole training step"""
+
+    def __init__(self, model: Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, batch):
+        return self.model.training_step(batch)
@@ -0,0 +1,70 @@
+"""Multi-GPU training, one process per GPU.
+Run with: torchrun --nproc_per_node=<number of GPUs> launch.py --epochs 10
+"""
+
+import argparse
+import os
+import torch
+import torch.distributed as dist
+
+import engine
+import models
+import utils.devices
+from main import get_dataset
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distributed training of SpikeYOLO")
+    parser.add_argument(
+        "--dataset", default="b", choices=["b", "h"], help="b-bananas, h-hardhat"
+    )
+    parser.add_argument("--epochs", type=int, default=1, help="Number of epochs")
+    parser.add_argument("--load", action="store_true", help="Load parameters")
+    parser.add_argument("--save", action="store_true", help="Save parameters")
+    parser.add_argument("--compile", action="store_true", help="Compile spiking blocks")
+    parser.add_argument(
+        "--skip-silent",
+        action="store_true",
+        help="Skip convolution of time steps without spikes in validation",
+    )
+    parser.add_argument(
+        "--precision", default="fp32", choices=engine.trainer.PRECISIONS.keys()
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    local_rank = int(os.environ["LOCAL_RANK"])
+    torch.cuda.set_device(local_rank)
+    dist.init_process_group("nccl")
+    is_main = dist.get_rank() == 0
+
+    data, params_file = get_dataset(args.dataset)
+    # The first process downloads the dataset, the others wait for it
+    if is_main:
+        data.update_dataset(is_train=True)
+        data.update_dataset(is_train=False)
+    dist.barrier()
+
+    model = models.SpikeYOLO(num_classes=1)
+    if args.load:
+        model.load_params(params_file)
+    model.to(utils.devices.gpu(local_rank))
+    # NHWC convolutions are faster on tensor cores, outputs follow the weight layout
+    model.to(memory_format=torch.channels_last)
+    if args.compile:
+        model.compile_blocks()
+    if args.skip_silent:
+        model.skip_silent_steps()
+    trainer = engine.Trainer(num_gpus=1, display=False, precision=args.precision)
+    trainer.prepare(model, data)
+
+    try:
+        trainer.fit(args.epochs)
+    except KeyboardInterrupt:
+        print("Training was stopped!")
+
+    if args.save and is_main:
+        model.save_params(params_file)
+    dist.destroy_process_group()
@@ -1,3 +1,4 @@
+import argparse
 import utils
 import engine
 import models
@@ -27,34 +28,51 @@ def ask_question(question, default="y"):
             print("Please respond with 'y' or 'n'")
 
 
+def get_dataset(choice: str):
+    """Returns the dataset and the name of its parameters file, b-bananas, h-hardhat"""
+    if choice == "b":
+        return utils.BananasDataset(
+            batch_size=16,
+            resize=v2.Resize((256, 256)),
+            normalize=v2.Normalize((0.23, 0.23, 0.23), (0.12, 0.12, 0.12)),
+        ), "bananas"
+    elif choice == "h":
+        return utils.HardHatDataset(
+            batch_size=16,
+            resize=v2.Resize((256, 256)),
+            normalize=v2.Normalize((0.23, 0.23, 0.23), (0.12, 0.12, 0.12)),
+            save_tensor=True,
+        ), "hardhat"
+    return None, None
+
+
 def ask_dataset(default: str = "b"):
     while True:
         print(f"Select dataset: b-bananas, h-hardhat (Default - {default})")
         choice = input().lower()
         if default is not None and choice == "":
             choice = default
-        if choice == "b":
-            return utils.BananasDataset(
-                batch_size=16,
-                resize=v2.Resize((256, 256)),
-                normalize=v2.Normalize((0.23, 0.23, 0.23), (0.12, 0.12, 0.12)),
-            ), "bananas"
-        elif choice == "h":
-            return utils.HardHatDataset(
-                batch_size=16,
-                resize=v2.Resize((256, 256)),
-                normalize=v2.Normalize((0.23, 0.23, 0.23), (0.12, 0.12, 0.12)),
-                save_tensor=True,
-            ), "hardhat"
-        else:
-            print("Please respond with 'y' or 'n'")
+        data, params_file = get_dataset(choice)
+        if data is not None:
+            return data, params_file
+        print("Please respond with 'b' or 'h'")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--precision", default="fp32", choices=engine.trainer.PRECISIONS.keys()
+    )
+    args = parser.parse_args()
+
     data, params_file = ask_dataset("b")
     model = models.SpikeYOLO(num_classes=1)
     model.to(utils.devices.gpu())
-    trainer = engine.Trainer(num_gpus=1, display=True, every_n=4)
+    # NHWC convolutions are faster on tensor cores, outputs follow the weight layout
+    model.to(memory_format=torch.channels_last)
+    trainer = engine.Trainer(
+        num_gpus=1, display=True, every_n=4, precision=args.precision
+    )
     trainer.prepare(model, data)
     plotter = utils.Plotter(threshold=0.001, rows=2, columns=4, labels=data.get_names())
 
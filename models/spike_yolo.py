@@ -26,6 +26,30 @@ class SpikeYOLO(Module):
         return torch.optim.Adamax(self.parameters(), lr=0.002)
         #return torch.optim.SGD(self.parameters(), lr=0.2, weight_decay=5e-4)
 
+    def compile_blocks(self, mode: str = "default"):
+        """Compiles spiking blocks with torch.compile. Blocks are compiled in place,
+        so parameter names do not change. Sizes are static, a new input size
+        triggers recompilation
+
+        Args:
+            mode (str, optional): torch.compile mode
+        """
+        for module in self.modules():
+            if isinstance(module, (SpikeDownSampleBlk, DetectorDirectDecoder)):
+                module.compile(mode=mode, dynamic=False)
+
+    def skip_silent_steps(self, enable: bool = True):
+        """Without autograd, spiking blocks skip convolution of time steps without
+        spikes. Costs a reduction and a host sync per block, so it pays off only
+        when many steps are silent
+
+        Args:
+            enable (bool, optional): Enable skipping
+        """
+        for module in self.modules():
+            if isinstance(module, (SpikeDownSampleBlk, DetectorDirectDecoder)):
+                module.skip_silent = enable
+
     def loss(self, y_hat, y):
         """
         Args:
@@ -66,7 +90,7 @@ class SpikeYOLO(Module):
             bbox_preds: [num_batch, all_anchors * 4]
         """
         Y = self.encoder(X)
-        Y, state = self.base_net(Y)
+        Y = self.base_net(Y)
         return self.fpn_blk(Y)
 
     def predict(self, X: torch.Tensor) -> torch.Tensor:
@@ -109,6 +133,64 @@ class SpikeClassifierYOLO(SpikeYOLO):
         return cls
 
 
+def to_compute_dtype(X: torch.Tensor, conv: nn.Conv2d) -> torch.Tensor:
+    """Converts spikes stored as bool (see SpikeDownSampleBlk) straight to the dtype
+    conv computes in, under autocast this avoids an fp32 temporary"""
+    if X.dtype != torch.bool:
+        return X
+    if X.is_cuda and torch.is_autocast_enabled():
+        return X.to(torch.get_autocast_gpu_dtype())
+    if not X.is_cuda and torch.is_autocast_cpu_enabled():
+        return X.to(torch.get_autocast_cpu_dtype())
+    return X.to(conv.weight.dtype)
+
+
+def spike_conv(conv: nn.Conv2d, X: torch.Tensor, skip_silent=False) -> torch.Tensor:
+    """Applies conv to spikes of all time steps at once
+
+    Args:
+        conv (nn.Conv2d): Convolution
+        X (torch.Tensor): Spikes [ts, num_batch, channels, h, w]
+        skip_silent (bool, optional): Without autograd, skip time steps without spikes
+
+    Returns:
+        torch.Tensor: [ts, num_batch, out_channels, h_out, w_out]
+    """
+    if skip_silent and not torch.is_grad_enabled():
+        return skip_silent_conv(conv, X)
+    return conv(to_compute_dtype(X, conv).flatten(0, 1)).unflatten(0, X.shape[:2])
+
+
+@torch.compiler.disable
+def skip_silent_conv(conv: nn.Conv2d, X: torch.Tensor) -> torch.Tensor:
+    """spike_conv without autograd. LIF layers need a few time steps to charge, so
+    the first steps may be empty. Convolution of zeros is just the bias, such
+    steps are not computed. The number of active steps depends on data, so this
+    function is not compiled to avoid recompilation for every count"""
+    # Reduces without reshaping, flatten would copy channels_last spikes
+    active = X.any(dim=(1, 2, 3, 4))
+    num_active = int(active.sum())
+    if not 0 < num_active < X.shape[0]:
+        return conv(to_compute_dtype(X, conv).flatten(0, 1)).unflatten(0, X.shape[:2])
+    Z = conv(to_compute_dtype(X[active], conv).flatten(0, 1))
+    # Keeps the layout of the conv output (channels_last for channels_last weights)
+    memory_format = (
+        torch.channels_last
+        if Z.is_contiguous(memory_format=torch.channels_last)
+        else torch.contiguous_format
+    )
+    Y = torch.empty(
+        (X.shape[0] * X.shape[1],) + Z.shape[1:],
+        dtype=Z.dtype,
+        device=Z.device,
+        memory_format=memory_format,
+    ).unflatten(0, X.shape[:2])
+    # Under autocast Z is half precision while the bias stays fp32
+    Y[~active] = 0 if conv.bias is None else conv.bias.to(Y.dtype).reshape(-1, 1, 1)
+    Y[active] = Z.unflatten(0, (num_active, X.shape[1]))
+    return Y
+
+
 class SpikeDownSampleBlk(nn.Module):
     """Reduces the height and width of input feature maps by half"""
 
@@ -116,20 +198,36 @@ class SpikeDownSampleBlk(nn.Module):
         super().__init__()
         self.conv1 = nn.Conv2d(in_channels, out_channels, kernel_size=3, padding=1)
         self.lif1 = norse.LIFCell()
+        self.skip_silent = False
         # self.conv2 = nn.Conv2d(out_channels, out_channels, kernel_size=3, padding=1)
         # self.lif2 = norse.LIFCell()
 
     def forward(self, X):
-        s1 = s2 = None
-        zs = []
-        for ts in range(X.shape[0]):
-            z = self.conv1(X[ts])
-            z, s1 = self.lif1(z, s1)
-            # z = self.conv2(z)
-            # z, s2 = self.lif2(z, s2)
-            z = nn.functional.max_pool2d(z, kernel_size=2, stride=2)
-            zs.append(z)
-        Y = torch.stack(zs)
+        # Stateless layers process all time steps at once, only LIF is looped
+        Z = spike_conv(self.conv1, X, self.skip_silent)
+        s1 = None
+        if torch.is_grad_enabled():
+            # In place writes would add a node per step, each copying the whole gradient
+            zs = []
+            for ts in range(Z.shape[0]):
+                z, s1 = self.lif1(Z[ts], s1)
+                zs.append(z)
+            Y = torch.stack(zs)
+        else:
+            # Spikes are written in place, empty_like keeps the memory format of Z
+            Y = torch.empty_like(Z)
+            for ts in range(Z.shape[0]):
+                Y[ts], s1 = self.lif1(Z[ts], s1)
+        Y = Y.flatten(0, 1)
+        if Z.flatten(0, 1).is_contiguous(memory_format=torch.channels_last):
+            # torch.stack returns the contiguous format, pooling and the next conv
+            # work faster without layout conversion
+            Y = Y.contiguous(memory_format=torch.channels_last)
+        Y = nn.functional.max_pool2d(Y, kernel_size=2, stride=2)
+        Y = Y.unflatten(0, X.shape[:2])
+        if not torch.is_grad_enabled():
+            # Without autograd binary spikes are stored in 1 byte instead of 4
+            Y = Y.bool()
         return Y
 
 
@@ -232,7 +330,8 @@ class SpikeCNN(nn.Module):
         num_filters = [3, 16, 32, 64]
         for i in range(len(num_filters) - 1):
             blk.append(SpikeDownSampleBlk(num_filters[i], num_filters[i + 1]))
-        self.cnn_net = norse.SequentialState(*blk)
+        # The blocks keep their LIF state internally, so no per-layer state is returned
+        self.cnn_net = nn.Sequential(*blk)
 
     def forward(self, X):
         return self.cnn_net(X)
@@ -259,6 +358,7 @@ class DetectorDirectDecoder(nn.Module):
             in_channels, in_channels, kernel_size=kernel_size, padding=kernel_size // 2
         )
         self.li = norse.LICell()
+        self.skip_silent = False
 
         self.box_preds = nn.Conv2d(in_channels, box_out, kernel_size=1)
         self.cls_preds = nn.Conv2d(in_channels, cls_out, kernel_size=1)
@@ -269,10 +369,10 @@ class DetectorDirectDecoder(nn.Module):
             boxes: predicted boxes
             classes: predicted classes
         """
+        Z = spike_conv(self.conv, X, self.skip_silent)
         s1 = None
-        for ts in range(X.shape[0]):
-            z = self.conv(X[ts])
-            z, s1 = self.li(z, s1)
+        for ts in range(Z.shape[0]):
+            z, s1 = self.li(Z[ts], s1)
 
         box = self.box_preds(z)
         cls = self.cls_preds(z)
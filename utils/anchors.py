@@ -20,6 +20,14 @@ class AnchorGenerator(nn.Module):
         """
         super().__init__()
         self.sizes, self.ratios, self.step = sizes, ratios, step
+        self.register_buffer(
+            "size_tensor", torch.tensor(sizes, dtype=torch.float32), persistent=False
+        )
+        self.register_buffer(
+            "ratio_tensor", torch.tensor(ratios, dtype=torch.float32), persistent=False
+        )
+        # Anchors depend only on the feature map size, key - (height, width, device)
+        self._cache = {}
 
     def __call__(self, X: torch.Tensor) -> torch.Tensor:
         """Returns hypotheses
@@ -30,50 +38,47 @@ class AnchorGenerator(nn.Module):
         Returns:
             torch.Tensor: Tensor with hypotheses. Shape: (number of anchors, 4). Data: [l_up_w, l_up_h, r_down_w, r_down_h]
         """
-        if not hasattr(self, "anchors"):
-            self.cal_anchors(X)
-
-        return self.anchors
+        in_height, in_width = X.shape[-2:]
+        key = (in_height, in_width, X.device)
+        anchors = self._cache.get(key)
+        if anchors is None:
+            anchors = self.cal_anchors(in_height, in_width, X.device)
+            self._cache[key] = anchors
+        return anchors
 
-    def cal_anchors(self, X: torch.Tensor) -> None:
-        """Calculates new anchors
+    def cal_anchors(
+        self, in_height: int, in_width: int, device: torch.device
+    ) -> torch.Tensor:
+        """Generate anchor boxes with different shapes centered on each pixel.
 
         Args:
-            X (torch.Tensor): Img tensor
+            in_height (int): Feature map height
+            in_width (int): Feature map width
+            device (torch.device): Device of the feature map
+
+        Returns:
+            torch.Tensor: Anchors [in_height * in_width * boxes_per_pixel, 4]
         """
-        """Generate anchor boxes with different shapes centered on each pixel."""
-        in_height, in_width = X.shape[-2:]
-        device, num_sizes, num_ratios = X.device, len(self.sizes), len(self.ratios)
-        boxes_per_pixel = (num_sizes + num_ratios - 1)
-        size_tensor = torch.tensor(self.sizes, device=device)
-        ratio_tensor = torch.tensor(self.ratios, device=device)
+        size_tensor = self.size_tensor.to(device)
+        ratio_tensor = self.ratio_tensor.to(device)
         # Offsets are required to move the anchor to the center of a pixel. Since
         # a pixel has height=1 and width=1, we choose to offset our centers by 0.5
-        offset_h, offset_w = 0.5, 0.5
-        steps_h = 1.0 / in_height  # Scaled steps in y axis
-        steps_w = 1.0 / in_width  # Scaled steps in x axis
-
-        # Generate all center points for the anchor boxes
-        center_h = (torch.arange(in_height, device=device) + offset_h) * steps_h
-        center_w = (torch.arange(in_width, device=device) + offset_w) * steps_w
-        shift_y, shift_x = torch.meshgrid(center_h, center_w, indexing='ij')
-        shift_y, shift_x = shift_y.reshape(-1), shift_x.reshape(-1)
+        center_h = (torch.arange(in_height, device=device) + 0.5) / in_height
+        center_w = (torch.arange(in_width, device=device) + 0.5) / in_width
+        shift_y, shift_x = torch.meshgrid(center_h, center_w, indexing="ij")
+        # [in_height * in_width, 1, 4]
+        centers = torch.stack((shift_x, shift_y, shift_x, shift_y), dim=-1).reshape(
+            -1, 1, 4
+        )
 
         # Generate `boxes_per_pixel` number of heights and widths that are later
         # used to create anchor box corner coordinates (xmin, xmax, ymin, ymax)
-        w = torch.cat((size_tensor * torch.sqrt(ratio_tensor[0]),
-                    self.sizes[0] * torch.sqrt(ratio_tensor[1:])))\
-                    * in_height / in_width  # Handle rectangular inputs
-        h = torch.cat((size_tensor / torch.sqrt(ratio_tensor[0]),
-                    self.sizes[0] / torch.sqrt(ratio_tensor[1:])))
-        # Divide by 2 to get half height and half width
-        anchor_manipulations = torch.stack((-w, -h, w, h)).T.repeat(
-                                            in_height * in_width, 1) / 2
-
-        # Each center point will have `boxes_per_pixel` number of anchor boxes, so
-        # generate a grid of all anchor box centers with `boxes_per_pixel` repeats
-        out_grid = torch.stack([shift_x, shift_y, shift_x, shift_y],
-                    dim=1).repeat_interleave(boxes_per_pixel, dim=0)
-        output = out_grid + anchor_manipulations
+        sqrt_ratios = torch.sqrt(ratio_tensor)
+        w = torch.cat((size_tensor * sqrt_ratios[0], size_tensor[:1] * sqrt_ratios[1:]))
+        w = w * in_height / in_width  # Handle rectangular inputs
+        h = torch.cat((size_tensor / sqrt_ratios[0], size_tensor[:1] / sqrt_ratios[1:]))
+        # Divide by 2 to get half height and half width. [1, boxes_per_pixel, 4]
+        half_sizes = torch.stack((-w, -h, w, h), dim=1).unsqueeze(0) / 2
 
-        self.anchors = output
+        # Each center point has `boxes_per_pixel` anchor boxes
+        return (centers + half_sizes).reshape(-1, 4)
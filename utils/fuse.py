@@ -0,0 +1,27 @@
+import copy
+import torch
+from torch import nn
+
+
+def fuse_conv_bn(conv: nn.Conv2d, bn: nn.BatchNorm2d) -> nn.Conv2d:
+    """Folds batch normalization into the preceding convolution.
+    Uses running statistics, so the result is only valid for inference.
+
+    Args:
+        conv (nn.Conv2d): Convolution followed by bn
+        bn (nn.BatchNorm2d): Batch normalization layer
+
+    Returns:
+        nn.Conv2d: Convolution equal to bn(conv(X)) in eval mode
+    """
+    fused = copy.deepcopy(conv)
+    with torch.no_grad():
+        scale = torch.rsqrt(bn.running_var + bn.eps)
+        shift = -bn.running_mean * scale
+        if bn.affine:
+            scale = scale * bn.weight
+            shift = shift * bn.weight + bn.bias
+        bias = conv.bias if conv.bias is not None else torch.zeros_like(shift)
+        fused.weight = nn.Parameter(conv.weight * scale.reshape(-1, 1, 1, 1))
+        fused.bias = nn.Parameter(bias * scale + shift)
+    return fused
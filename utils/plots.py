@@ -1,6 +1,8 @@
 from matplotlib import pyplot as plt
 import collections
 
+Point = collections.namedtuple("Point", ["x", "y"])
+
 
 class ProgressBoard:
     """The board that plots data points in animation."""
@@ -36,46 +38,43 @@ class ProgressBoard:
         if not self.display:
             return
 
-        Point = collections.namedtuple("Point", ["x", "y"])
-
         if label not in self.raw_points:
             self.raw_points[label] = []
-            self.data[label] = []
+            self.data[label] = ([], [])
         points = self.raw_points[label]
-        linep = self.data[label]
+        xs, ys = self.data[label]
 
         points.append(Point(x, y))
         if len(points) != every_n:
             return
 
         mean = lambda x: sum(x) / len(x)
-        linep.append(Point(mean([p.x for p in points]), mean([p.y for p in points])))
+        xs.append(mean([p.x for p in points]))
+        ys.append(mean([p.y for p in points]))
         points.clear()
 
         if label not in self.lines:
             (line,) = self.axes.plot(
-                linep[0].x,
-                linep[0].y,
+                xs,
+                ys,
                 linestyle=self.ls[len(self.lines) % 4],
                 color=self.colors[len(self.lines) % 4],
             )
             self.lines[label] = line
+            self.axes.legend(self.lines.values(), self.lines.keys())
             return
 
-        self.lines[label].set_xdata([p.x for p in linep])
-        self.lines[label].set_ydata([p.y for p in linep])
-        self.lines[label].set_ydata([p.y for p in linep])
+        self.lines[label].set_data(xs, ys)
         left, right = self.axes.get_xlim()
         self.axes.set_xlim(
-            left if linep[-1].x > left else linep[-1].x,
-            right if linep[-1].x < right else linep[-1].x,
+            left if xs[-1] > left else xs[-1],
+            right if xs[-1] < right else xs[-1],
         )
         bottom, top = self.axes.get_ylim()
         self.axes.set_ylim(
-            bottom if linep[-1].y > bottom else linep[-1].y,
-            top if linep[-1].y < top else linep[-1].y,
+            bottom if ys[-1] > bottom else ys[-1],
+            top if ys[-1] < top else ys[-1],
         )
-        self.axes.legend(self.lines.values(), self.lines.keys())
 
         self.fig.canvas.draw()
         self.fig.canvas.flush_events()